@@ -3,8 +3,9 @@ from tkinter import ttk, filedialog, messagebox
 import os
 from typing import Optional
 import threading
+import queue
 from pathlib import Path
-from pdf_converter import PDFConverter
+from pdf_converter import PDFConverter, QUALITY_PRESETS
 
 class DarkModeConverterGUI:
     """Main GUI application for the PDF Dark Mode Converter."""
@@ -21,10 +22,13 @@ class DarkModeConverterGUI:
         self.current_file: Optional[str] = None
         self.is_converting = False
         
+        # Messages from the conversion thread, drained on the Tk main loop
+        self.msg_q: queue.Queue = queue.Queue()
+        
         self.setup_ui()
         
         # Initialize the PDF converter
-        self.converter = PDFConverter(dpi=300)
+        self.converter = PDFConverter(quality=self.quality_var.get())
     
     def setup_ui(self) -> None:
         """Create and arrange the GUI elements."""
@@ -57,6 +61,22 @@ class DarkModeConverterGUI:
         )
         self.file_label.pack(fill=tk.X)
         
+        # Quality selection
+        quality_frame = ttk.Frame(main_frame)
+        quality_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        ttk.Label(quality_frame, text="Quality:").pack(side=tk.LEFT)
+        
+        self.quality_var = tk.StringVar(value="screen")
+        self.quality_box = ttk.Combobox(
+            quality_frame,
+            textvariable=self.quality_var,
+            values=list(QUALITY_PRESETS),
+            state="readonly",
+            width=12
+        )
+        self.quality_box.pack(side=tk.LEFT, padx=(10, 0))
+        
         # Convert button
         self.convert_button = ttk.Button(
             main_frame,
@@ -69,7 +89,7 @@ class DarkModeConverterGUI:
         # Progress bar (hidden by default)
         self.progress = ttk.Progressbar(
             main_frame,
-            mode='indeterminate',
+            mode='determinate',
             orient=tk.HORIZONTAL
         )
         
@@ -104,10 +124,15 @@ class DarkModeConverterGUI:
         # Disable controls during conversion
         self.convert_button.config(state=tk.DISABLED)
         self.browse_button.config(state=tk.DISABLED)
+        self.quality_box.config(state=tk.DISABLED)
+        
+        # Pick up a changed quality preset
+        if self.converter.quality != self.quality_var.get():
+            self.converter = PDFConverter(quality=self.quality_var.get())
         
         # Show progress bar
+        self.progress.config(value=0)
         self.progress.pack(fill=tk.X, pady=(10, 10))
-        self.progress.start(10)
         
         # Set converting flag
         self.is_converting = True
@@ -125,20 +150,56 @@ class DarkModeConverterGUI:
     
     def perform_conversion(self, input_path: str, output_path: str) -> None:
         """Perform the actual PDF conversion."""
+        # Tk is not thread-safe, so only talk to the main loop via the queue
         try:
-            self.status_label.config(text="Converting PDF to dark mode...")
-            self.converter.convert_pdf_to_dark_mode(input_path, output_path)
+            self.msg_q.put(("status", "Converting PDF to dark mode..."))
+            self.converter.convert_pdf_to_dark_mode(
+                input_path,
+                output_path,
+                progress_cb=lambda done, total: self.msg_q.put(("progress", done, total))
+            )
             
             # Show success message
-            self.window.after(0, self.show_success, output_path)
+            self.msg_q.put(("success", output_path))
             
         except Exception as e:
             # Show error message
-            self.window.after(0, self.show_error, str(e))
+            self.msg_q.put(("error", str(e)))
             
         finally:
             # Reset UI state
-            self.window.after(0, self.reset_ui)
+            self.msg_q.put(("done",))
+    
+    def _drain_queue(self) -> None:
+        """Apply pending messages from the conversion thread, then reschedule."""
+        try:
+            while True:
+                try:
+                    kind, *args = self.msg_q.get_nowait()
+                except queue.Empty:
+                    break
+                
+                if kind == "status":
+                    self.status_label.config(text=args[0])
+                elif kind == "progress":
+                    done, total = args
+                    # One extra step is left for saving the PDF
+                    self.progress.config(maximum=total + 1, value=done)
+                    if done < total:
+                        self.status_label.config(text=f"Converting page {done}/{total}...")
+                    else:
+                        self.status_label.config(text="Saving PDF...")
+                elif kind == "success":
+                    self.progress.config(value=self.progress['maximum'])
+                    self.show_success(*args)
+                elif kind == "error":
+                    self.show_error(*args)
+                elif kind == "done":
+                    self.reset_ui()
+        finally:
+            # Keep polling even if a handler raised, so later messages
+            # (such as "done") are still applied
+            self.window.after(100, self._drain_queue)
     
     def show_success(self, output_path: str) -> None:
         """Show success message and ask to open the output file."""
@@ -158,14 +219,15 @@ class DarkModeConverterGUI:
     def reset_ui(self) -> None:
         """Reset the UI state after conversion."""
         self.is_converting = False
-        self.progress.stop()
         self.progress.pack_forget()
         self.convert_button.config(state=tk.NORMAL)
         self.browse_button.config(state=tk.NORMAL)
+        self.quality_box.config(state="readonly")
         self.status_label.config(text="Ready for next conversion")
     
     def run(self) -> None:
         """Start the GUI application."""
+        self.window.after(100, self._drain_queue)
         self.window.mainloop()
 
 if __name__ == "__main__":
@@ -1,136 +1,625 @@
 #!/usr/bin/env python3
 import fitz  # PyMuPDF
-from PIL import Image
-import io
+from PIL import Image, ImageChops
+import numpy as np
+import hashlib
 import os
+import re
 import argparse
-from typing import List, Tuple
-import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from collections import deque
+from contextlib import ExitStack, nullcontext
+from functools import partial
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, Literal, Optional, Tuple, Union
+
+try:
+    # Optional: multi-threaded SIMD kernel for very large pages
+    from numba import njit, prange, set_num_threads
+except ImportError:
+    njit = None
+
+# Below this many bytes NumPy's single pass beats spinning up Numba threads
+PARALLEL_INVERT_THRESHOLD = 16 * 1024 * 1024
+
+# Rows compared at a time when checking whether a page rendered colorless
+GRAY_CHECK_ROWS = 256
+
+if njit is not None:
+    @njit(parallel=True, nogil=True, cache=True)
+    def _parallel_invert(samples):
+        for i in prange(samples.size):
+            samples[i] ^= 0xFF
+else:
+    _parallel_invert = None
+
+def _invert_in_place(samples: np.ndarray, parallel: bool = True) -> None:
+    """
+    Invert a flat uint8 buffer in place.
+    
+    Uses the Numba kernel for huge buffers when Numba is installed, and a
+    single NumPy XOR pass otherwise.
+    
+    Args:
+        samples: Writable uint8 array to invert
+        parallel: Allow the multi-threaded Numba kernel; pass False when
+            several threads may invert concurrently
+    """
+    if parallel and _parallel_invert is not None and samples.size >= PARALLEL_INVERT_THRESHOLD:
+        _parallel_invert(samples)
+    else:
+        np.bitwise_xor(samples, 0xFF, out=samples)
+
+def _render_invert_pixmap(
+    pdf_document: fitz.Document,
+    page_num: int,
+    matrix: fitz.Matrix,
+    lock: Optional[threading.Lock] = None,
+    parallel_invert: bool = True
+) -> fitz.Pixmap:
+    """
+    Render a single page and invert its colors in place.
+    
+    Args:
+        pdf_document: Open input PDF
+        page_num: Zero-based index of the page to render
+        matrix: Scaling matrix applied to the page when rendering
+        lock: Held while touching pdf_document, when it is shared between
+            threads (PyMuPDF documents are not thread-safe)
+        parallel_invert: Allow the multi-threaded Numba inversion kernel
+    
+    Returns:
+        Pixmap of the page with inverted colors, grayscale for pages that
+        render without any color and RGB otherwise
+    """
+    with lock or nullcontext():
+        page = pdf_document[page_num]
+        
+        # Only pages whose images are all grayscale can come out colorless
+        image_info = page.get_image_info()
+        maybe_gray = bool(image_info) and all(info["colorspace"] == 1 for info in image_info)
+        
+        # Convert page to pixmap (image)
+        pix = page.get_pixmap(matrix=matrix, alpha=False)
+    
+    # Text, drawings or annotations may still add color, so check the
+    # rendered pixels before dropping to one byte per pixel
+    if maybe_gray:
+        rgb = np.frombuffer(pix.samples_mv, dtype=np.uint8).reshape(pix.height, pix.width, 3)
+        # Compare R==G and G==B in bands of rows, so the temporaries stay
+        # small and a colored page stops at its first colored band
+        if all(
+            np.array_equal(band[..., :2], band[..., 1:])
+            for band in (rgb[y:y + GRAY_CHECK_ROWS] for y in range(0, pix.height, GRAY_CHECK_ROWS))
+        ):
+            pix = fitz.Pixmap(fitz.csGRAY, pix)
+    
+    # Invert the pixmap's own sample buffer in place, no extra copy.
+    # Both NumPy and Numba release the GIL here, so threads overlap.
+    _invert_in_place(np.frombuffer(pix.samples_mv, dtype=np.uint8), parallel_invert)
+    return pix
+
+# Input PDF opened once per worker process by _init_worker
+_worker_doc: Optional[fitz.Document] = None
+# Whether this worker process has spare CPUs for the Numba kernel
+_worker_parallel_invert = False
+
+def _init_worker(pdf_bytes: bytes, invert_threads: int) -> None:
+    """
+    Open the input PDF once for the lifetime of a worker process.
+    
+    Args:
+        pdf_bytes: Contents of the input PDF file
+        invert_threads: Numba threads this worker may use for inversion,
+            so the pool as a whole does not oversubscribe the CPUs
+    """
+    global _worker_doc, _worker_parallel_invert
+    _worker_doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    # With one thread per worker the kernel is just a slower NumPy pass;
+    # it only pays off when there are fewer workers than CPUs
+    _worker_parallel_invert = _parallel_invert is not None and invert_threads > 1
+    if _worker_parallel_invert:
+        set_num_threads(invert_threads)
+
+def _render_invert_page(page_num: int, matrix: fitz.Matrix) -> Tuple[int, int, int, int, bytes]:
+    """
+    Render a single page and invert its colors. Runs inside a worker process.
+    
+    Args:
+        page_num: Zero-based index of the page to render
+        matrix: Scaling matrix applied to the page when rendering
+    
+    Returns:
+        Tuple of (page_num, width, height, channels, inverted samples)
+    """
+    pix = _render_invert_pixmap(_worker_doc, page_num, matrix, parallel_invert=_worker_parallel_invert)
+    return (page_num, pix.width, pix.height, pix.n, pix.samples)
+
+# Indirect object reference such as "12 0 R"
+_OBJECT_REF = re.compile(r"(\d+) \d+ R\b")
+
+def _page_cache_key(page: fitz.Page, dpi: int, jpeg_quality: int) -> str:
+    """
+    Hash everything that affects how a page renders.
+    
+    Args:
+        page: PyMuPDF page to hash
+        dpi: Rendering DPI
+        jpeg_quality: JPEG quality of the encoded page
+    
+    Returns:
+        Hex digest identifying the rendered, inverted page
+    """
+    pdf_document = page.parent
+    digest = hashlib.blake2b(page.read_contents(), digest_size=20)
+    
+    # Resources may be inherited from an ancestor in the page tree
+    xref = page.xref
+    kind, resources = pdf_document.xref_get_key(xref, "Resources")
+    while kind == "null":
+        kind, parent = pdf_document.xref_get_key(xref, "Parent")
+        if kind != "xref":
+            break
+        xref = int(parent.split()[0])
+        kind, resources = pdf_document.xref_get_key(xref, "Resources")
+    digest.update(resources.encode())
+    
+    # The content stream only names its resources (images, fonts, forms,
+    # graphics states, shadings, patterns, color spaces), so hash every
+    # object they reach, plus the annotations, which are rendered too
+    pending = deque(int(ref) for ref in _OBJECT_REF.findall(resources))
+    pending.extend(annot[0] for annot in page.annot_xrefs())
+    seen = set()
+    while pending:
+        xref = pending.popleft()
+        if xref in seen or xref <= 0:
+            continue
+        seen.add(xref)
+        # Annotations point back at their page; don't walk the page tree
+        if pdf_document.xref_get_key(xref, "Type")[1] in ("/Page", "/Pages"):
+            continue
+        obj = pdf_document.xref_object(xref, compressed=True)
+        digest.update(obj.encode())
+        digest.update(pdf_document.xref_stream_raw(xref) or b"")
+        pending.extend(int(ref) for ref in _OBJECT_REF.findall(obj))
+    
+    digest.update(f"{page.rect}|{page.rotation}|{dpi}|{jpeg_quality}".encode())
+    return digest.hexdigest()
+
+class PageCache:
+    """On-disk cache of inverted JPEG pages, evicted least recently used first."""
+    
+    def __init__(self, cache_dir: str, max_size: int):
+        """
+        Initialize the cache. The directory is created on the first put().
+        
+        Args:
+            cache_dir: Directory holding the cached pages
+            max_size: Size in bytes the cache is trimmed to by sweep()
+        """
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.jpg")
+    
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Read a cached page and mark it as recently used.
+        
+        Args:
+            key: Page cache key
+        
+        Returns:
+            JPEG bytes of the page, or None if it is not cached
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as cached:
+                data = cached.read()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return data
+    
+    def put(self, key: str, data: bytes) -> None:
+        """
+        Store a page, replacing the cache file atomically.
+        
+        Args:
+            key: Page cache key
+            data: JPEG bytes of the page
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        partial_path = f"{path}.{os.getpid()}.part"
+        with open(partial_path, 'wb') as cached:
+            cached.write(data)
+        os.replace(partial_path, path)
+    
+    def sweep(self) -> None:
+        """Delete the least recently used pages until the cache fits max_size."""
+        if not os.path.isdir(self.cache_dir):
+            return
+        
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".jpg"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+# Rendering DPI for each output quality preset
+QUALITY_PRESETS = {
+    "screen": 150,
+    "print": 300,
+    "archival": 600,
+}
+
+Quality = Literal["screen", "print", "archival"]
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "pdf_darkmode")
+DEFAULT_CACHE_SIZE = 512 * 1024 * 1024
 
 class PDFConverter:
-    def __init__(self, dpi: int = 400):
+    def __init__(
+        self,
+        dpi: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        jpeg_quality: int = 85,
+        quality: Quality = "screen",
+        cache_dir: Optional[str] = None,
+        cache_size: int = DEFAULT_CACHE_SIZE
+    ):
         """
         Initialize the converter with specified DPI for image quality.
         
         Args:
-            dpi: Dots per inch for PDF to image conversion (default: 300)
+            dpi: Dots per inch for PDF to image conversion, overrides the
+                quality preset when given
+            max_workers: Number of worker processes used to render pages
+                (default: number of CPUs)
+            jpeg_quality: JPEG quality used for the output pages (default: 85)
+            quality: Preset picking the DPI when none is given: "screen"
+                (150), "print" (300) or "archival" (600) (default: "screen")
+            cache_dir: Directory caching inverted pages between runs, such
+                as DEFAULT_CACHE_DIR (default: None, no caching)
+            cache_size: Maximum size of the page cache in bytes (default: 512 MB)
         """
-        self.dpi = dpi
+        self.quality = quality
+        self.dpi = dpi or QUALITY_PRESETS[quality]
+        self.jpeg_quality = jpeg_quality
+        self.max_workers = max_workers or os.cpu_count()
         # Calculate the scaling factor based on DPI
         self.zoom = self.dpi / 72  # 72 is the default PDF DPI
         # Create scaling matrix for PDF rendering
         self.matrix = fitz.Matrix(self.zoom, self.zoom)
+        self.cache = PageCache(cache_dir, cache_size) if cache_dir else None
+        # Page pixmaps reused across pages of the same size
+        self._pixmap_pool: Dict[Tuple[int, int, int], fitz.Pixmap] = {}
 
-    def pdf_to_images(self, pdf_path: str) -> List[Image.Image]:
+    def _pooled_pixmap(self, width: int, height: int, channels: int, samples: bytes) -> fitz.Pixmap:
         """
-        Convert each page of a PDF to a PIL Image.
+        Copy worker samples into a pixmap reused for every page of this shape.
         
         Args:
-            pdf_path: Path to the input PDF file
+            width: Page width in pixels
+            height: Page height in pixels
+            channels: Number of color channels (1 for gray, 3 for RGB)
+            samples: Inverted samples returned by a worker process
         
         Returns:
-            List of PIL Image objects, one for each page
+            Pooled pixmap holding the samples
+        """
+        pix = self._pixmap_pool.get((width, height, channels))
+        if pix is None:
+            colorspace = fitz.csGRAY if channels == 1 else fitz.csRGB
+            pix = self._pixmap_pool[(width, height, channels)] = fitz.Pixmap(colorspace, width, height, samples, 0)
+        else:
+            np.copyto(np.frombuffer(pix.samples_mv, dtype=np.uint8), np.frombuffer(samples, dtype=np.uint8))
+        return pix
+
+    def iter_inverted_pages(
+        self,
+        pdf_path: str,
+        use_threads: bool = False,
+        progress_cb: Optional[Callable[[int, int], None]] = None
+    ) -> Iterator[Tuple[fitz.Page, Optional[Union[fitz.Pixmap, bytes]]]]:
         """
-        print("Converting PDF to images...")
-        images = []
-        pdf_document = fitz.open(pdf_path)
+        Yield each page of a PDF with its color-inverted rendering, in order.
         
-        for page_num in range(len(pdf_document)):
-            print(f"Converting page {page_num + 1}/{len(pdf_document)} to image")
-            page = pdf_document[page_num]
-            
-            # Convert page to pixmap (image)
-            pix = page.get_pixmap(matrix=self.matrix, alpha=False)
-            
-            # Convert pixmap to PIL Image
-            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-            images.append(img)
+        Pages without embedded images, annotations or form fields are not
+        rasterized; they are yielded without a rendering so they can be
+        inverted as vector content.
+        Pages that need rasterizing are rendered in parallel across worker
+        processes (or threads), but only a small window of pages is kept in
+        flight so memory stays bounded regardless of the document length.
+        
+        When the page cache is enabled, rasterized pages are yielded as
+        encoded JPEG bytes instead, read from the cache when possible and
+        stored there otherwise.
+        
+        Args:
+            pdf_path: Path to the input PDF file
+            use_threads: Render in a thread pool instead of a process pool,
+                trading some throughput for lower startup cost and memory
+            progress_cb: Called as progress_cb(done, total) once the consumer
+                has finished with each page
+        
+        Yields:
+            Tuples of (source page, inverted gray or RGB pixmap, JPEG bytes
+            or None for vector pages), one for each page. A pixmap may be
+            reused for a later page, so consume it before advancing the
+            iterator.
+        """
+        print("Converting PDF to inverted images...")
+        # Read the file once; every document below is opened from memory
+        with open(pdf_path, 'rb') as pdf_file:
+            pdf_bytes = pdf_file.read()
+        pdf_document = fitz.open(stream=pdf_bytes, filetype="pdf")
+        page_count = len(pdf_document)
+        
+        # Pages with only text and drawings are inverted as vectors instead
+        vector_pages = {n for n in range(page_count) if self._is_vector_page(pdf_document[n])}
+        
+        # Look up rasterized pages from earlier runs
+        cache_keys = {}
+        if self.cache:
+            cache_keys = {
+                n: _page_cache_key(pdf_document[n], self.dpi, self.jpeg_quality)
+                for n in range(page_count) if n not in vector_pages
+            }
+        cached_pages = {n for n, key in cache_keys.items() if key in self.cache}
         
-        pdf_document.close()
-        return images
+        page_nums = (n for n in range(page_count) if n not in vector_pages and n not in cached_pages)
+        with ExitStack() as stack:
+            stack.enter_context(pdf_document)
+            if use_threads:
+                # One document shared by all render threads, separate from the
+                # one the writer reads vector pages from
+                render_document = stack.enter_context(fitz.open(stream=pdf_bytes, filetype="pdf"))
+                # Numba's parallel kernel cannot be launched from several
+                # threads at once, so these threads use NumPy's XOR
+                task = partial(
+                    _render_invert_pixmap,
+                    render_document,
+                    lock=threading.Lock(),
+                    parallel_invert=False
+                )
+                workers = min(4, self.max_workers)
+                executor = ThreadPoolExecutor(max_workers=workers)
+            else:
+                task = _render_invert_page
+                workers = self.max_workers
+                executor = ProcessPoolExecutor(
+                    max_workers=workers,
+                    initializer=_init_worker,
+                    initargs=(pdf_bytes, max(1, (os.cpu_count() or 1) // self.max_workers))
+                )
+            # Shut the pool down before the documents it renders from close
+            stack.enter_context(executor)
+            
+            try:
+                render = partial(executor.submit, task, matrix=self.matrix)
+                # Finished futures hold whole pixmaps, so keep the window
+                # proportional to the threads or processes actually rendering
+                pending = deque(render(n) for n in islice(page_nums, 2 * workers))
+                
+                def next_page(page_num: int) -> Optional[Union[fitz.Pixmap, bytes]]:
+                    if page_num in vector_pages:
+                        print(f"Keeping page {page_num + 1}/{page_count} as vector")
+                        return None
+                    
+                    if page_num in cached_pages:
+                        data = self.cache.get(cache_keys[page_num])
+                        if data is not None:
+                            print(f"Reusing cached page {page_num + 1}/{page_count}")
+                            return data
+                        # Evicted since the lookup, render it after all
+                        future = render(page_num)
+                    else:
+                        future = pending.popleft()
+                        # Top the window back up before handing this page out
+                        pending.extend(render(n) for n in islice(page_nums, 1))
+                    
+                    result = future.result()
+                    print(f"Converting page {page_num + 1}/{page_count} to image")
+                    if use_threads:
+                        pix = result
+                    else:
+                        _, width, height, channels, samples = result
+                        pix = self._pooled_pixmap(width, height, channels, samples)
+                    
+                    if page_num not in cache_keys:
+                        return pix
+                    data = pix.tobytes("jpg", jpg_quality=self.jpeg_quality)
+                    self.cache.put(cache_keys[page_num], data)
+                    return data
+                
+                for page_num in range(page_count):
+                    # Only the page handed out stays referenced, so it is
+                    # freed as soon as the consumer is done with it
+                    image = next_page(page_num)
+                    yield pdf_document[page_num], image
+                    del image
+                    
+                    # The consumer has finished with this page by now
+                    if progress_cb:
+                        progress_cb(page_num + 1, page_count)
+            finally:
+                self._pixmap_pool.clear()
 
-    def invert_image(self, image: Image.Image) -> Image.Image:
+    @staticmethod
+    def _is_vector_page(page: fitz.Page) -> bool:
         """
-        Invert the colors of an image while preserving color relationships.
+        Check whether a page can be inverted without rasterizing it.
         
         Args:
-            image: PIL Image to process
+            page: PyMuPDF page to inspect
         
         Returns:
-            PIL Image with inverted colors
+            True if the page has no embedded images, annotations or form
+            fields (show_pdf_page only copies the content stream, so those
+            are rendered through the raster path instead)
         """
-        # Convert to RGB mode if not already
-        if image.mode != 'RGB':
-            image = image.convert('RGB')
+        return not (page.get_images() or page.first_annot or page.first_widget)
+
+    @staticmethod
+    def _append_vector_page(output_document: fitz.Document, source_page: fitz.Page) -> None:
+        """
+        Copy a page into the output document and invert it as vector content.
         
-        # Create an inverted version of the image
-        inverted_image = Image.new('RGB', image.size)
+        The page is painted over a white background and then covered by a
+        white rectangle in Difference blend mode, which flips every color
+        without touching the text or drawing operators.
         
-        # Get image data
-        data = image.getdata()
-        inverted_data = []
+        Args:
+            output_document: Document the inverted page is appended to
+            source_page: Page to copy from the input PDF
+        """
+        # Copy the content unrotated and carry /Rotate over at the end, since
+        # show_pdf_page would otherwise bake the rotation into the drawing.
+        # The source is an in-memory copy, so clearing its /Rotate is safe.
+        rotation = source_page.rotation
+        source_page.set_rotation(0)
+        try:
+            page = output_document.new_page(width=source_page.rect.width, height=source_page.rect.height)
+            page.show_pdf_page(page.rect, source_page.parent, source_page.number)
+        finally:
+            source_page.set_rotation(rotation)
+        
+        # Register a Difference blend graphics state on the page
+        blend = output_document.get_new_xref()
+        output_document.update_object(blend, "<</Type/ExtGState/BM/Difference>>")
+        kind, resources = output_document.xref_get_key(page.xref, "Resources")
+        if kind == "xref":
+            output_document.xref_set_key(int(resources.split()[0]), "ExtGState", f"<</DarkInvert {blend} 0 R>>")
+        else:
+            output_document.xref_set_key(page.xref, "Resources/ExtGState", f"<</DarkInvert {blend} 0 R>>")
         
-        # Process each pixel
-        for pixel in data:
-            # Invert each RGB channel
-            inverted_pixel = tuple(255 - value for value in pixel)
-            inverted_data.append(inverted_pixel)
+        def add_stream(data: str) -> int:
+            xref = output_document.get_new_xref()
+            output_document.update_object(xref, "<<>>")
+            output_document.update_stream(xref, data.encode())
+            return xref
         
-        inverted_image.putdata(inverted_data)
-        return inverted_image
+        # Wrap the original content between the background and the inversion
+        rect = f"0 0 {page.rect.width:g} {page.rect.height:g} re f"
+        contents = [add_stream(f"q 1 g {rect} Q")] + page.get_contents() + [add_stream(f"q /DarkInvert gs 1 g {rect} Q")]
+        output_document.xref_set_key(page.xref, "Contents", "[" + " ".join(f"{xref} 0 R" for xref in contents) + "]")
+        page.set_rotation(rotation)
 
-    def images_to_pdf(self, images: List[Image.Image], output_path: str) -> None:
+    def invert_image(self, image: Image.Image) -> Image.Image:
         """
-        Convert a list of images to a PDF file.
+        Invert the colors of an image while preserving color relationships.
         
         Args:
-            images: List of PIL Images to convert
+            image: PIL Image to process, in RGB or L mode
+        
+        Returns:
+            PIL Image with inverted colors
+        
+        Raises:
+            ValueError: If the image is in any other mode
+        """
+        # Every byte is inverted, so an alpha channel or palette indices
+        # would be flipped too
+        if image.mode not in ("RGB", "L"):
+            raise ValueError(f"Cannot invert image in {image.mode} mode, convert it to RGB or L first")
+        return ImageChops.invert(image)
+
+    def images_to_pdf(
+        self,
+        pages: Iterable[Tuple[fitz.Page, Optional[Union[fitz.Pixmap, bytes]]]],
+        output_path: str
+    ) -> None:
+        """
+        Convert a sequence of images to a PDF file, one page at a time.
+        
+        Args:
+            pages: Iterable of (source page, image) tuples, where the image is
+                a pixmap or JPEG bytes, or None to invert the source page as
+                vector content. Output pages take the source page's size.
             output_path: Path where the output PDF should be saved
         """
         print("\nCreating PDF from inverted images...")
+        output_document = fitz.open()
         
-        # Create a temporary directory to store intermediate files
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Save the first image as PDF
-            first_image = images[0]
-            pdf_path = os.path.join(temp_dir, "output.pdf")
+        for source_page, image in pages:
+            if image is None:
+                self._append_vector_page(output_document, source_page)
+                continue
+            
+            if isinstance(image, bytes):
+                stream = image
+            else:
+                # Encode the samples straight to JPEG, no PIL round-trip
+                stream = image.tobytes("jpg", jpg_quality=self.jpeg_quality)
             
-            # Convert images to PDF pages
-            first_image.save(
-                pdf_path,
-                "PDF",
-                resolution=self.dpi,
-                save_all=True,
-                append_images=images[1:]
+            # Match the source page size exactly rather than deriving it from
+            # the rounded pixel dimensions
+            page = output_document.new_page(
+                width=source_page.rect.width,
+                height=source_page.rect.height
             )
+            page.insert_image(page.rect, stream=stream)
             
-            # Copy the temporary PDF to the final location
-            with open(pdf_path, 'rb') as temp_pdf:
-                with open(output_path, 'wb') as final_pdf:
-                    final_pdf.write(temp_pdf.read())
+            # Release the page before the next one is requested
+            del image, stream
+        
+        # Write next to the target and rename into place, so a failed save
+        # never leaves a truncated PDF behind
+        partial_path = output_path + ".part"
+        try:
+            output_document.save(partial_path, garbage=4, deflate=True)
+        except Exception:
+            output_document.close()
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
+        output_document.close()
+        os.replace(partial_path, output_path)
 
-    def convert_pdf_to_dark_mode(self, input_path: str, output_path: str) -> None:
+    def convert_pdf_to_dark_mode(
+        self,
+        input_path: str,
+        output_path: str,
+        use_threads: bool = False,
+        progress_cb: Optional[Callable[[int, int], None]] = None
+    ) -> None:
         """
         Convert a PDF to dark mode using image conversion as an intermediate step.
         
         Args:
             input_path: Path to the input PDF file
             output_path: Path where the dark mode PDF should be saved
+            use_threads: Render pages in a thread pool instead of a process pool
+            progress_cb: Called as progress_cb(done, total) after each page has
+                been written; saving the file follows the last call
         """
         try:
-            # Step 1: Convert PDF to images
-            images = self.pdf_to_images(input_path)
+            # Step 1: Render each page with inverted colors
+            pages = self.iter_inverted_pages(input_path, use_threads, progress_cb)
             
-            # Step 2: Invert colors of each image
-            print("\nInverting colors...")
-            inverted_images = []
-            for i, image in enumerate(images, 1):
-                print(f"Inverting colors for page {i}/{len(images)}")
-                inverted_image = self.invert_image(image)
-                inverted_images.append(inverted_image)
+            # Step 2: Stream inverted images back into a PDF
+            self.images_to_pdf(pages, output_path)
             
-            # Step 3: Convert inverted images back to PDF
-            self.images_to_pdf(inverted_images, output_path)
+            # Keep the page cache within its size limit
+            if self.cache:
+                self.cache.sweep()
             
             print(f"\nDark mode PDF successfully created: {output_path}")
             
@@ -146,8 +635,19 @@ def main():
     parser.add_argument('input_pdf', help='Path to input PDF file')
     parser.add_argument('--output', '-o', 
                        help='Path to output PDF file (default: input_darkmode.pdf)')
-    parser.add_argument('--dpi', type=int, default=300,
-                       help='DPI for image conversion (default: 300)')
+    parser.add_argument('--quality', choices=list(QUALITY_PRESETS), default='screen',
+                       help='Output quality preset: screen (150 DPI), print (300 DPI) '
+                            'or archival (600 DPI) (default: screen)')
+    parser.add_argument('--dpi', type=int, default=None,
+                       help='DPI for image conversion, overrides --quality')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Number of worker processes (default: number of CPUs); '
+                            'with numba installed, fewer workers than CPUs leaves '
+                            'threads free to invert very large pages')
+    parser.add_argument('--threads', action='store_true',
+                       help='Render pages in a thread pool instead of worker processes')
+    parser.add_argument('--cache', action='store_true',
+                       help='Cache inverted pages in ~/.cache/pdf_darkmode to speed up re-conversions')
     
     args = parser.parse_args()
     
@@ -157,10 +657,15 @@ def main():
         args.output = f"{base}_darkmode{ext}"
     
     # Create converter and process the PDF
-    converter = PDFConverter(dpi=args.dpi)
+    converter = PDFConverter(
+        dpi=args.dpi,
+        max_workers=args.workers,
+        quality=args.quality,
+        cache_dir=DEFAULT_CACHE_DIR if args.cache else None
+    )
     
     try:
-        converter.convert_pdf_to_dark_mode(args.input_pdf, args.output)
+        converter.convert_pdf_to_dark_mode(args.input_pdf, args.output, use_threads=args.threads)
     except Exception as e:
         print(f"Error processing PDF: {e}")
         exit(1)